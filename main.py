@@ -3,7 +3,7 @@ from scripts.renderer import Renderer
 import sys
 
 
-def convert(input, output, scale=4):
+def convert(input, output, scale=1, supersample=1, backend='pillow'):
     """
     Converts an SVG file to a PNG file.
 
@@ -11,13 +11,16 @@ def convert(input, output, scale=4):
         input (str): Path to the input SVG file.
         output (str): Path to the output PNG file.
         scale (int): Scaling factor for resolution.
+        supersample (int): Antialiasing factor; the image is drawn this many times larger and downsampled.
+        backend (str): Drawing library, 'pillow' or 'aggdraw'.
     """
     p = Parser(input)
     width, height = p.extract_dimensions()
     elements = p.parse()
-    r = Renderer(width, height, scale)
+    r = Renderer(width, height, scale, supersample=supersample, backend=backend)
     r.draw_elements(elements)
     r.save_PNG(output)
+    print("Successfully convert SVG file to PNG.")
 
 
 if __name__ == '__main__':
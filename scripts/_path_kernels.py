@@ -0,0 +1,489 @@
+"""
+Curve flattening kernels used by PathParser.
+
+The kernels are written as scalar loops, which run as plain Python and are still cheaper
+than NumPy for the handful of points a single curve produces. compile_kernels compiles
+them with Numba when it is installed (cached on disk, so only the first run pays the
+compile time). Importing Numba costs a noticeable fraction of a second, so PathParser
+only asks for it once it meets a path long enough to benefit.
+
+flatten_path runs the whole path command loop and is only worth calling when compiled;
+PathParser falls back to its own command handlers otherwise.
+"""
+import math
+
+import numpy as np
+
+# Names of the functions compile_kernels compiles.
+_KERNELS = []
+
+# Whether the kernels are compiled, or None until compile_kernels is first called.
+_compiled = None
+
+
+def _kernel(function):
+    """
+    Marks a function to be compiled by compile_kernels.
+    """
+    _KERNELS.append(function.__name__)
+    return function
+
+
+def compile_kernels():
+    """
+    Compiles the kernels with Numba, the first time it is called.
+
+    The compiled kernels replace the Python ones in this module, so they are found
+    both by callers and by the kernels calling each other.
+
+    Returns:
+        bool: Whether the kernels are compiled; False if Numba is not installed.
+    """
+    global _compiled
+    if _compiled is None:
+        try:
+            from numba import njit
+        except ImportError:
+            _compiled = False
+        else:
+            namespace = globals()
+            for name in _KERNELS:
+                namespace[name] = njit(cache=True)(namespace[name])
+            _compiled = True
+    return _compiled
+
+# Commands of flatten_path, in the order of PATH_COMMANDS.
+MOVE, LINE, HORIZONTAL, VERTICAL, CUBIC, SMOOTH_CUBIC, QUADRATIC, SMOOTH_QUADRATIC, ARC, CLOSE = range(10)
+
+# Command letters as encoded for flatten_path: code // 2 is the command and code % 2
+# marks relative coordinates.
+PATH_COMMANDS = "MmLlHhVvCcSsQqTtAaZz"
+
+# Number of values each command reads.
+ARITY = np.array([2, 2, 1, 1, 6, 4, 4, 2, 7, 0])
+
+# Distance between a cubic and a single quadratic, per unit of |p3 - 3p2 + 3p1 - p0|.
+_CUBIC_ERROR_SCALE = math.sqrt(3) / 36
+
+
+@_kernel
+def _parabola_integral(x):
+    """
+    Approximates the integral of (1 + 4x^2)^-1/4, which measures how many segments
+    a unit parabola needs between two points (Levien's flattening method).
+    """
+    return x / (0.33 + math.sqrt(math.sqrt(0.67 ** 4 + 0.25 * x * x)))
+
+
+@_kernel
+def _parabola_inv_integral(x):
+    """
+    Approximates the inverse of _parabola_integral.
+    """
+    return x * (0.61 + math.sqrt(0.39 ** 2 + 0.25 * x * x))
+
+
+@_kernel
+def _near_chord(start, control, end, distance):
+    """
+    Tells whether a control point projects onto the chord from start to end and lies
+    within `distance` of it.
+    """
+    chord = end - start
+    offset = control - start
+    along = chord.real * offset.real + chord.imag * offset.imag
+    across = chord.real * offset.imag - chord.imag * offset.real
+    length_sq = chord.real * chord.real + chord.imag * chord.imag
+    return 0 < length_sq and 0 <= along <= length_sq and abs(across) <= distance * math.sqrt(length_sq)
+
+
+@_kernel
+def cubic_to_quadratics(p0, p1, p2, p3, tolerance, max_segments):
+    """
+    Approximates a cubic Bezier curve with a chain of quadratic Bezier curves.
+
+    A single quadratic deviates from the cubic by sqrt(3) / 36 * |p3 - 3p2 + 3p1 - p0|,
+    and splitting the cubic into n pieces divides that error by n^3. Each piece gets the
+    quadratic whose control point averages the tangent lines at its ends.
+
+    Args:
+        p0, p1, p2, p3 (complex): Control points of the cubic.
+        tolerance (float): Maximum distance between the quadratics and the cubic.
+        max_segments (int): Upper bound on the number of quadratics.
+
+    Returns:
+        tuple[numpy.ndarray]: Complex start, control and end points of each quadratic.
+    """
+    # A cubic strays from its chord by at most 3/4 of its control points' distance to it,
+    # so a nearly straight one is replaced by a single straight quadratic.
+    if _near_chord(p0, p1, p3, 4 / 3 * tolerance) and _near_chord(p0, p2, p3, 4 / 3 * tolerance):
+        return np.full(1, p0), np.full(1, (p0 + p3) / 2), np.full(1, p3)
+
+    # Power-basis coefficients, evaluated with Horner's rule.
+    c = 3 * (p1 - p0)
+    b = 3 * (p2 - 2 * p1 + p0)
+    a = p3 - 3 * p2 + 3 * p1 - p0
+
+    error = _CUBIC_ERROR_SCALE * abs(a)
+    n = min(max_segments, max(1, math.ceil((error / tolerance) ** (1 / 3))))
+
+    starts = np.empty(n, np.complex128)
+    controls = np.empty(n, np.complex128)
+    ends = np.empty(n, np.complex128)
+    point, tangent = p0, c / n
+    for i in range(1, n + 1):
+        t = i / n
+        next_point = ((a * t + b) * t + c) * t + p0
+        next_tangent = ((3 * a * t + 2 * b) * t + c) / n
+        starts[i - 1] = point
+        controls[i - 1] = (point + next_point) / 2 + (tangent - next_tangent) / 4
+        ends[i - 1] = next_point
+        point, tangent = next_point, next_tangent
+    ends[n - 1] = p3
+    return starts, controls, ends
+
+
+@_kernel
+def flatten_quadratics(p0, p1, p2, tolerance, max_segments):
+    """
+    Flattens a chain of quadratic Bezier curves into a polyline.
+
+    Each quadratic is mapped onto a segment of the unit parabola, where the number of
+    segments needed and their spacing have closed forms. This places points densely
+    where the curve bends and sparsely where it is straight, instead of sampling
+    evenly in t. A straight curve is drawn as its chord or, if it runs past one end
+    and turns back, as the two segments meeting where it turns.
+
+    Args:
+        p0, p1, p2 (numpy.ndarray): Complex start, control and end points of each quadratic.
+        tolerance (numpy.ndarray): Maximum distance between the polyline and each curve.
+        max_segments (int): Upper bound on the number of segments per quadratic.
+
+    Returns:
+        numpy.ndarray: Complex points of the polyline, excluding the start of the chain.
+    """
+    k = len(p0)
+    counts = np.ones(k, np.int64)
+    a0s = np.zeros(k)
+    das = np.zeros(k)
+    u0s = np.zeros(k)
+    uscales = np.zeros(k)
+    turns = np.full(k, -1.0)
+    total = 0
+    for j in range(k):
+        q0, q1, q2 = complex(p0[j]), complex(p1[j]), complex(p2[j])
+        sqrt_tol = math.sqrt(tolerance[j])
+        dd = 2 * q1 - q0 - q2
+        chord = q2 - q0
+        cross = chord.real * dd.imag - chord.imag * dd.real
+        mapped = False
+        # A quadratic strays from its chord by at most half its control point's distance
+        # to it, so a nearly straight one keeps the chord alone.
+        if cross != 0 and not _near_chord(q0, q1, q2, 2 * tolerance[j]):
+            # Map the curve onto the parabola y = x^2, between x0 and x2.
+            x0 = ((q1 - q0).real * dd.real + (q1 - q0).imag * dd.imag) / cross
+            x2 = ((q2 - q1).real * dd.real + (q2 - q1).imag * dd.imag) / cross
+            sqrt_scale = math.sqrt(abs(cross) / (abs(dd) * abs(x2 - x0)))
+
+            a0 = _parabola_integral(x0)
+            a2 = _parabola_integral(x2)
+            da = abs(a2 - a0)
+            if math.copysign(1.0, x0) == math.copysign(1.0, x2):
+                val = da * sqrt_scale
+            else:
+                val = sqrt_tol * da / _parabola_integral(sqrt_tol / sqrt_scale)
+            if math.isfinite(val):
+                mapped = True
+                counts[j] = min(max_segments, max(1, math.ceil(0.5 * val / sqrt_tol)))
+                u0 = _parabola_inv_integral(a0)
+                a0s[j] = a0
+                das[j] = a2 - a0
+                u0s[j] = u0
+                uscales[j] = 1.0 / (_parabola_inv_integral(a2) - u0)
+        if not mapped:
+            # A straight curve keeps its chord, unless its control point lies off the chord:
+            # it then runs past an end and turns back at t = (q1 - q0).dd / |dd|^2.
+            offset = q1 - q0
+            along = chord.real * offset.real + chord.imag * offset.imag
+            length_sq = chord.real * chord.real + chord.imag * chord.imag
+            if not 0 <= along <= length_sq or (length_sq == 0 and offset != 0):
+                turns[j] = (offset.real * dd.real + offset.imag * dd.imag) / (dd.real * dd.real + dd.imag * dd.imag)
+                counts[j] = 2
+        total += counts[j]
+
+    out = np.empty(total, np.complex128)
+    index = 0
+    for j in range(k):
+        n = counts[j]
+        if n > 1:
+            q0, q1, q2 = complex(p0[j]), complex(p1[j]), complex(p2[j])
+            c = 2 * (q1 - q0)
+            b = q2 - 2 * q1 + q0
+            if turns[j] >= 0:
+                t = float(turns[j])
+                out[index] = (b * t + c) * t + q0
+                index += 1
+            else:
+                a0, da, u0, uscale = float(a0s[j]), float(das[j]), float(u0s[j]), float(uscales[j])
+                for i in range(1, n):
+                    t = (_parabola_inv_integral(a0 + da * i / n) - u0) * uscale
+                    out[index] = (b * t + c) * t + q0
+                    index += 1
+        out[index] = p2[j]
+        index += 1
+    return out
+
+
+@_kernel
+def arc_points(p0, rx, ry, x_rot, large_arc, sweep, p1, tolerance, max_segments):
+    """
+    Generates points for an elliptical arc given in SVG endpoint form.
+
+    The arc is split into as many segments as needed to keep each chord within
+    `tolerance` of the ellipse's larger circle, and the sample angles are produced by
+    repeatedly rotating a unit vector instead of computing a cos and sin per sample.
+
+    Args:
+        p0 (complex): Starting point.
+        rx (float): X-axis radius.
+        ry (float): Y-axis radius.
+        x_rot (float): Rotation of the ellipse in degrees.
+        large_arc (int): Flag for large arc (1 = true, 0 = false).
+        sweep (int): Flag for arc direction (1 = clockwise, 0 = counterclockwise).
+        p1 (complex): Ending point.
+        tolerance (float): Maximum distance between the polyline and the arc.
+        max_segments (int): Upper bound on the number of segments.
+
+    Returns:
+        numpy.ndarray: Complex points along the arc, including both ends.
+    """
+    # Arcs ending where they start are omitted, and arcs with a zero radius are straight lines.
+    if p0 == p1:
+        return np.full(1, p0)
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0:
+        out = np.empty(2, np.complex128)
+        out[0] = p0
+        out[1] = p1
+        return out
+
+    x_rot = math.radians(x_rot)
+    cos_rot, sin_rot = math.cos(x_rot), math.sin(x_rot)
+
+    dx = (p0.real - p1.real) / 2.0
+    dy = (p0.imag - p1.imag) / 2.0
+    x1p = cos_rot * dx + sin_rot * dy
+    y1p = -sin_rot * dx + cos_rot * dy
+    x1p_sq = x1p ** 2
+    y1p_sq = y1p ** 2
+
+    # Radii too small to reach the end point are scaled up just enough to do so, which
+    # centers the ellipse on the midpoint of the chord.
+    radii_scale = x1p_sq / rx ** 2 + y1p_sq / ry ** 2
+    if radii_scale >= 1:
+        rx, ry = rx * math.sqrt(radii_scale), ry * math.sqrt(radii_scale)
+        c = 0.0
+    else:
+        rx_sq = rx ** 2
+        ry_sq = ry ** 2
+        radicand = (rx_sq * ry_sq - rx_sq * y1p_sq - ry_sq * x1p_sq) / (rx_sq * y1p_sq + ry_sq * x1p_sq)
+        c = math.sqrt(radicand) if large_arc != sweep else -math.sqrt(radicand)
+    cxp = c * (rx * y1p) / ry
+    cyp = c * -(ry * x1p) / rx
+    cx = cos_rot * cxp - sin_rot * cyp + (p0.real + p1.real) / 2
+    cy = sin_rot * cxp + cos_rot * cyp + (p0.imag + p1.imag) / 2
+
+    theta1 = math.atan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+    delta_theta = math.atan2((-y1p - cyp) / ry, (-x1p - cxp) / rx) - theta1
+    if not sweep and delta_theta > 0:
+        delta_theta -= 2 * math.pi
+    elif sweep:
+        delta_theta = (delta_theta + 2 * math.pi) % (2 * math.pi)
+
+    # A chord spanning an angle d deviates from a circle of radius r by r * (1 - cos(d / 2)),
+    # so keeping that within the tolerance bounds the angle per segment.
+    max_step = 2 * math.acos(max(-1.0, 1 - tolerance / max(rx, ry)))
+    n = min(max_segments, max(1, math.ceil(abs(delta_theta) / max_step)))
+
+    step = complex(math.cos(delta_theta / n), math.sin(delta_theta / n))
+    unit = complex(math.cos(theta1), math.sin(theta1))
+    out = np.empty(n + 1, np.complex128)
+    for i in range(n + 1):
+        x, y = rx * unit.real, ry * unit.imag
+        out[i] = complex(cx + x * cos_rot - y * sin_rot, cy + x * sin_rot + y * cos_rot)
+        unit *= step
+    return out
+
+
+@_kernel
+def _reserve(array, needed):
+    """
+    Returns `array`, or a copy at least twice as long if it holds fewer than `needed` values.
+    """
+    if needed <= len(array):
+        return array
+    grown = np.empty(max(needed, 2 * len(array)), array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+@_kernel
+def flatten_path(codes, ends, operands, tolerance, cubic_share, max_segments):
+    """
+    Flattens encoded SVG path data into subpaths, following the same rules as
+    PathParser's command handlers; tests/test_path_parser.py checks that both agree.
+
+    Numbers beyond a command's own repeat it (a moveto repeats as a lineto). Runs of
+    consecutive curves are flattened together, and a command missing some of its
+    numbers ends the path.
+
+    Args:
+        codes (numpy.ndarray): Each command, as its index in PATH_COMMANDS.
+        ends (numpy.ndarray): Index into `operands` just past each command's numbers.
+        operands (numpy.ndarray): The numbers of all commands, in order.
+        tolerance (float): Maximum distance between the flattened and the true curve.
+        cubic_share (float): Share of the tolerance spent approximating cubics with quadratics.
+        max_segments (int): Upper bound on the number of segments per curve.
+
+    Returns:
+        tuple[numpy.ndarray]: Complex points of all subpaths, and the start and end
+            index of each subpath into them, as consecutive pairs.
+    """
+    points = np.empty(256, np.complex128)
+    n = 0
+    bounds = np.empty(16, np.int64)
+    n_bounds = 0
+    subpath_start = 0
+
+    # Quadratics waiting to be flattened together.
+    starts = np.empty(64, np.complex128)
+    controls = np.empty(64, np.complex128)
+    curve_ends = np.empty(64, np.complex128)
+    tolerances = np.empty(64)
+    n_curves = 0
+
+    current = 0j
+    control = 0j
+    last = -1
+    i = 0
+    complete = True
+    for g in range(len(codes)):
+        command, relative = codes[g] // 2, codes[g] % 2 == 1
+        end = ends[g]
+        while complete:
+            arity = ARITY[command]
+            if i + arity > end:
+                # Missing numbers are an error; the path is drawn up to it.
+                complete = False
+                break
+            if n_curves and not CUBIC <= command <= SMOOTH_QUADRATIC:
+                flat = flatten_quadratics(starts[:n_curves], controls[:n_curves], curve_ends[:n_curves],
+                                          tolerances[:n_curves], max_segments)
+                points = _reserve(points, n + len(flat))
+                points[n:n + len(flat)] = flat
+                n += len(flat)
+                n_curves = 0
+
+            offset = current if relative else 0j
+            if command == MOVE or command == CLOSE:
+                if command == MOVE:
+                    current = complex(operands[i], operands[i + 1]) + offset
+                elif n > subpath_start:
+                    current = points[subpath_start]
+                    points = _reserve(points, n + 1)
+                    points[n] = current
+                    n += 1
+                # A subpath holding a single point draws nothing, so it is reused instead.
+                if n - subpath_start > 1:
+                    bounds = _reserve(bounds, n_bounds + 2)
+                    bounds[n_bounds] = subpath_start
+                    bounds[n_bounds + 1] = n
+                    n_bounds += 2
+                    subpath_start = n
+                else:
+                    n = subpath_start
+                points = _reserve(points, n + 1)
+                points[n] = current
+                n += 1
+            elif command <= VERTICAL:
+                if command == LINE:
+                    current = complex(operands[i], operands[i + 1]) + offset
+                elif command == HORIZONTAL:
+                    current = complex(operands[i] + offset.real, current.imag)
+                else:
+                    current = complex(current.real, operands[i] + offset.imag)
+                points = _reserve(points, n + 1)
+                points[n] = current
+                n += 1
+            elif command == ARC:
+                end_point = complex(operands[i + 5], operands[i + 6]) + offset
+                arc = arc_points(current, operands[i], operands[i + 1], operands[i + 2], int(operands[i + 3]),
+                                 int(operands[i + 4]), end_point, tolerance, max_segments)
+                points = _reserve(points, n + len(arc) - 1)
+                points[n:n + len(arc) - 1] = arc[1:]
+                n += len(arc) - 1
+                current = end_point
+            else:
+                # Curves: the first control point of a smooth curve reflects the previous one.
+                k = i
+                if command == CUBIC or command == QUADRATIC:
+                    c1 = complex(operands[k], operands[k + 1]) + offset
+                    k += 2
+                elif (command == SMOOTH_CUBIC and (last == CUBIC or last == SMOOTH_CUBIC)) or \
+                        (command == SMOOTH_QUADRATIC and (last == QUADRATIC or last == SMOOTH_QUADRATIC)):
+                    c1 = 2 * current - control
+                else:
+                    c1 = current
+                if command == CUBIC or command == SMOOTH_CUBIC:
+                    c2 = complex(operands[k], operands[k + 1]) + offset
+                    end_point = complex(operands[k + 2], operands[k + 3]) + offset
+                    q0, q1, q2 = cubic_to_quadratics(current, c1, c2, end_point, cubic_share * tolerance,
+                                                     max_segments)
+                    count = len(q0)
+                    starts = _reserve(starts, n_curves + count)
+                    controls = _reserve(controls, n_curves + count)
+                    curve_ends = _reserve(curve_ends, n_curves + count)
+                    tolerances = _reserve(tolerances, n_curves + count)
+                    starts[n_curves:n_curves + count] = q0
+                    controls[n_curves:n_curves + count] = q1
+                    curve_ends[n_curves:n_curves + count] = q2
+                    tolerances[n_curves:n_curves + count] = (1 - cubic_share) * tolerance
+                    n_curves += count
+                    control = c2
+                else:
+                    end_point = complex(operands[k], operands[k + 1]) + offset
+                    starts = _reserve(starts, n_curves + 1)
+                    controls = _reserve(controls, n_curves + 1)
+                    curve_ends = _reserve(curve_ends, n_curves + 1)
+                    tolerances = _reserve(tolerances, n_curves + 1)
+                    starts[n_curves] = current
+                    controls[n_curves] = c1
+                    curve_ends[n_curves] = end_point
+                    tolerances[n_curves] = tolerance
+                    n_curves += 1
+                    control = c1
+                current = end_point
+
+            i += arity
+            last = command
+            if command == MOVE:
+                command = LINE
+            if command == CLOSE or i >= end:
+                break
+        if not complete:
+            break
+        # Numbers following a closepath are ignored.
+        i = end
+
+    if n_curves:
+        flat = flatten_quadratics(starts[:n_curves], controls[:n_curves], curve_ends[:n_curves],
+                                  tolerances[:n_curves], max_segments)
+        points = _reserve(points, n + len(flat))
+        points[n:n + len(flat)] = flat
+        n += len(flat)
+    if n - subpath_start > 1:
+        bounds = _reserve(bounds, n_bounds + 2)
+        bounds[n_bounds] = subpath_start
+        bounds[n_bounds + 1] = n
+        n_bounds += 2
+    return points[:n], bounds[:n_bounds]
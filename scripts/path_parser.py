@@ -1,57 +1,306 @@
 import re
 
+import numpy as np
+
+from scripts import _path_kernels
+
+MAX_SEGMENTS = 256
+
+# Importing Numba and loading the compiled kernels takes about 0.3 s, which the compiled
+# command loop only wins back over roughly this many characters of path data. Paths run
+# through the command handlers until that much has been parsed.
+NUMBA_MIN_LENGTH = 200000
+
+# Characters of path data parsed so far, counted towards NUMBA_MIN_LENGTH.
+_parsed_length = 0
+
+# Share of the tolerance spent approximating cubics with quadratics; flattening gets the rest.
+CUBIC_TO_QUADRATIC_TOLERANCE = 0.1
+
+_COMMAND_RE = re.compile(r'([MmLlHhVvCcSsQqTtAaZz])')
+_NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+# Coordinates following a moveto without a new command are implicit linetos.
+_IMPLICIT_COMMANDS = {"M": "L", "m": "l"}
+
+_CURVE_COMMANDS = frozenset("CcSsQqTt")
+_CUBIC_COMMANDS = frozenset("CcSs")
+_QUADRATIC_COMMANDS = frozenset("QqTt")
+
+_COMMAND_CODES = {command: code for code, command in enumerate(_path_kernels.PATH_COMMANDS)}
+
+# Number of values each command reads.
+_COMMAND_ARITY = {command: int(_path_kernels.ARITY[code // 2]) for command, code in _COMMAND_CODES.items()}
+
+
+def _split_commands(path_data):
+    """
+    Splits SVG path data into command letters and the numbers following each one.
+
+    Numbers before the first command are ignored, as the parser would ignore them.
+
+    Args:
+        path_data (str): SVG path data string.
+
+    Yields:
+        tuple[str, list[str]]: A command letter and its numbers.
+    """
+    parts = _COMMAND_RE.split(path_data)
+    for k in range(1, len(parts), 2):
+        command = parts[k]
+        numbers = _NUMBER_RE.findall(parts[k + 1])
+        if command in "Aa":
+            numbers = _split_arc_flags(numbers)
+        yield command, numbers
+
+
+def _encode(path_data):
+    """
+    Encodes SVG path data as the arrays read by _path_kernels.flatten_path.
+
+    Args:
+        path_data (str): SVG path data string.
+
+    Returns:
+        tuple[numpy.ndarray]: The code of each command, the index just past each
+            command's numbers, and the numbers of all commands.
+    """
+    codes, ends, operands = [], [], []
+    for command, numbers in _split_commands(path_data):
+        codes.append(_COMMAND_CODES[command])
+        operands.extend(map(float, numbers))
+        ends.append(len(operands))
+    return np.array(codes, dtype=np.int64), np.array(ends, dtype=np.int64), np.array(operands, dtype=np.float64)
+
+
+def _split_arc_flags(numbers):
+    """
+    Separates arc flags from the numbers they were written against.
+
+    Arc flags are single digits that may be written without separators
+    (e.g. 'A5 5 0 1110 10'), so they are split off the numbers that follow them.
+
+    Args:
+        numbers (list[str]): The numbers following an A/a command.
+
+    Returns:
+        list[str]: The numbers with each flag on its own.
+    """
+    split = []
+    for number in numbers:
+        while len(split) % 7 in (3, 4) and len(number) > 1 and number[0] in "01":
+            split.append(number[0])
+            number = number[1:]
+        split.append(number)
+    return split
+
 
 class PathParser:
     """
-    Parses SVG path data and generates a list of points for rendering.
+    Parses SVG path data and generates a list of subpaths for rendering.
 
     Supports commands: M, L, H, V, C, S, Q, T, A, Z (and their lowercase equivalents).
+    Curves are flattened into as many segments as needed to stay within `tolerance`
+    of the true curve.
+
+    When Numba is installed and NUMBA_MIN_LENGTH characters of path data have been parsed,
+    the whole command loop runs compiled, in _path_kernels.flatten_path; otherwise each
+    command is processed by its handler here.
     """
 
-    def __init__(self, path_data):
+    TOLERANCE = 0.25
+
+    def __init__(self, path_data, tolerance=TOLERANCE):
         """
         Initializes the parser with SVG path data.
 
         Args:
             path_data (str): SVG path data string containing commands and coordinates.
+            tolerance (float): Maximum distance between the flattened and the true curve.
         """
-        self.commands = re.findall(r'[MmLlHhVvCcSsQqTtAaZz]|-?\d+\.?\d*', path_data)
-        self.current_position = [0, 0]
-        self.points = []
+        self.path_data = path_data
+        self.tolerance = tolerance
+        self.numbers = None
+        self.i = 0
+        self.current_position = 0j
+        self.points = np.empty(256, dtype=np.complex128)
+        self.n_points = 0
+        self.subpath_start = 0
+        self.subpaths = []
         self.last_command = None
         self.control_point = None
+        # Quadratics waiting to be flattened together, see _flush_curves.
+        self.curve_starts = []
+        self.curve_controls = []
+        self.curve_ends = []
+        self.curve_tolerances = []
+        self.handlers = {}
+        for commands, handler in (("Mm", self._handle_move_to), ("Ll", self._handle_line_to),
+                                  ("Hh", self._handle_horizontal_line_to), ("Vv", self._handle_vertical_line_to),
+                                  ("Cc", self._handle_cubic_bezier), ("Ss", self._handle_smooth_cubic_bezier),
+                                  ("Qq", self._handle_quadratic_bezier), ("Tt", self._handle_smooth_quadratic_bezier),
+                                  ("Aa", self._handle_arc), ("Zz", self._handle_close_path)):
+            for cmd in commands:
+                self.handlers[cmd] = handler
 
     def parse(self):
         """
-        Parses the path data and generates a list of points.
+        Parses the path data and generates the points of each subpath.
+
+        Returns:
+            list[numpy.ndarray]: One array of shape (n, 2) with (x, y) coordinates per subpath.
+        """
+        global _parsed_length
+        _parsed_length += len(self.path_data)
+        if _parsed_length >= NUMBA_MIN_LENGTH and _path_kernels.compile_kernels():
+            points, bounds = _path_kernels.flatten_path(*_encode(self.path_data), self.tolerance,
+                                                        CUBIC_TO_QUADRATIC_TOLERANCE, MAX_SEGMENTS)
+            points = points.view(np.float64).reshape(-1, 2)
+            return [points[start:end] for start, end in bounds.reshape(-1, 2).tolist()]
+
+        handlers = self.handlers
+        complete = True
+        for cmd, numbers in _split_commands(self.path_data):
+            self.numbers, self.i = [float(number) for number in numbers], 0
+            arity = _COMMAND_ARITY[cmd]
+            # Numbers beyond a command's own repeat it; those following a closepath are ignored.
+            while True:
+                if self.i + arity > len(self.numbers):
+                    # Missing numbers are an error; the path is drawn up to it.
+                    complete = False
+                    break
+                if self.curve_ends and cmd not in _CURVE_COMMANDS:
+                    self._flush_curves()
+                handlers[cmd](cmd)
+                self.last_command = cmd
+                cmd = _IMPLICIT_COMMANDS.get(cmd, cmd)
+                if arity == 0 or self.i == len(self.numbers):
+                    break
+            if not complete:
+                break
+        self._flush_curves()
+
+        subpaths = self.subpaths
+        if self.n_points - self.subpath_start > 1:
+            subpaths = subpaths + [(self.subpath_start, self.n_points)]
+        points = self.points.view(np.float64).reshape(-1, 2)
+        return [points[start:end] for start, end in subpaths]
+
+    def _pop(self):
+        """
+        Returns the next number of the current command and advances the cursor.
+
+        Returns:
+            float: The next coordinate.
+        """
+        number = self.numbers[self.i]
+        self.i += 1
+        return number
+
+    def _pop_point(self, relative):
+        """
+        Reads the next two coordinates as a point.
+
+        Args:
+            relative (bool): Whether the coordinates are relative to the current position.
 
         Returns:
-            list[tuple]: List of (x, y) coordinates for rendering.
-        """
-        while self.commands:
-            cmd = self.commands.pop(0)
-            if cmd in "Mm":
-                self._handle_move_to(cmd)
-            elif cmd in "Ll":
-                self._handle_line_to(cmd)
-            elif cmd in "Hh":
-                self._handle_horizontal_line_to(cmd)
-            elif cmd in "Vv":
-                self._handle_vertical_line_to(cmd)
-            elif cmd in "Cc":
-                self._handle_cubic_bezier(cmd)
-            elif cmd in "Ss":
-                self._handle_smooth_cubic_bezier(cmd)
-            elif cmd in "Qq":
-                self._handle_quadratic_bezier(cmd)
-            elif cmd in "Tt":
-                self._handle_smooth_quadratic_bezier(cmd)
-            elif cmd in "Aa":
-                self._handle_arc(cmd)
-            elif cmd in "Zz":
-                self._handle_close_path()
-            self.last_command = cmd
-        return self.points
+            complex: The point as x + yj.
+        """
+        point = complex(self.numbers[self.i], self.numbers[self.i + 1])
+        self.i += 2
+        return point + self.current_position if relative else point
+
+    def _reserve(self, count):
+        """
+        Makes room for `count` more points, doubling the buffer as needed.
+
+        Args:
+            count (int): Number of points about to be added.
+        """
+        needed = self.n_points + count
+        if needed > len(self.points):
+            points = np.empty(max(needed, 2 * len(self.points)), dtype=np.complex128)
+            points[:self.n_points] = self.points[:self.n_points]
+            self.points = points
+
+    def _emit_point(self, point):
+        """
+        Appends a single point to the current subpath.
+
+        Args:
+            point (complex): The point as x + yj.
+        """
+        if self.n_points == len(self.points):
+            self._reserve(1)
+        self.points[self.n_points] = point
+        self.n_points += 1
+
+    def _emit(self, points):
+        """
+        Appends sampled curve points to the current subpath, skipping the first one,
+        which repeats the current position.
+
+        Args:
+            points (numpy.ndarray): Complex points along the curve.
+        """
+        count = len(points) - 1
+        self._reserve(count)
+        self.points[self.n_points:self.n_points + count] = points[1:]
+        self.n_points += count
+
+    def _queue_quadratics(self, starts, controls, ends, tolerance):
+        """
+        Queues quadratic Bezier curves to be flattened with the rest of their run.
+
+        Args:
+            starts, controls, ends (list | numpy.ndarray): Complex points of each quadratic.
+            tolerance (float): Maximum distance between the polyline and the curves.
+        """
+        self.curve_starts.extend(starts)
+        self.curve_controls.extend(controls)
+        self.curve_ends.extend(ends)
+        self.curve_tolerances.extend([tolerance] * len(ends))
+
+    def _flush_curves(self):
+        """
+        Flattens the queued quadratics in a single kernel call and appends their points.
+        """
+        if not self.curve_ends:
+            return
+        points = _path_kernels.flatten_quadratics(np.array(self.curve_starts, dtype=np.complex128),
+                                                  np.array(self.curve_controls, dtype=np.complex128),
+                                                  np.array(self.curve_ends, dtype=np.complex128),
+                                                  np.array(self.curve_tolerances), MAX_SEGMENTS)
+        count = len(points)
+        self._reserve(count)
+        self.points[self.n_points:self.n_points + count] = points
+        self.n_points += count
+        self.curve_starts, self.curve_controls, self.curve_ends, self.curve_tolerances = [], [], [], []
+
+    def _queue_cubic(self, p0, p1, p2, p3):
+        """
+        Approximates a cubic Bezier curve with quadratics and queues them.
+
+        Args:
+            p0, p1, p2, p3 (complex): Control points of the cubic.
+        """
+        quadratics = _path_kernels.cubic_to_quadratics(p0, p1, p2, p3, CUBIC_TO_QUADRATIC_TOLERANCE * self.tolerance,
+                                                       MAX_SEGMENTS)
+        self._queue_quadratics(*quadratics, (1 - CUBIC_TO_QUADRATIC_TOLERANCE) * self.tolerance)
+
+    def _start_subpath(self):
+        """
+        Starts a new subpath at the current position.
+
+        A subpath holding a single point draws nothing, so it is reused instead.
+        """
+        if self.n_points - self.subpath_start > 1:
+            self.subpaths.append((self.subpath_start, self.n_points))
+            self.subpath_start = self.n_points
+        else:
+            self.n_points = self.subpath_start
+        self._emit_point(self.current_position)
 
     def _handle_move_to(self, cmd):
         """
@@ -60,9 +309,8 @@ class PathParser:
         Args:
             cmd (str): The SVG command ('M' or 'm').
         """
-        x, y = float(self.commands.pop(0)), float(self.commands.pop(0))
-        self.current_position = [self.current_position[0] + x, self.current_position[1] + y] if cmd == "m" else [x, y]
-        self.points.append(tuple(self.current_position))
+        self.current_position = self._pop_point(cmd == "m")
+        self._start_subpath()
 
     def _handle_line_to(self, cmd):
         """
@@ -71,9 +319,8 @@ class PathParser:
         Args:
             cmd (str): The SVG command ('L' or 'l').
         """
-        x, y = float(self.commands.pop(0)), float(self.commands.pop(0))
-        self.current_position = [self.current_position[0] + x, self.current_position[1] + y] if cmd == "l" else [x, y]
-        self.points.append(tuple(self.current_position))
+        self.current_position = self._pop_point(cmd == "l")
+        self._emit_point(self.current_position)
 
     def _handle_horizontal_line_to(self, cmd):
         """
@@ -82,9 +329,11 @@ class PathParser:
         Args:
             cmd (str): The SVG command ('H' or 'h').
         """
-        x = float(self.commands.pop(0))
-        self.current_position[0] = self.current_position[0] + x if cmd == "h" else x
-        self.points.append(tuple(self.current_position))
+        x = self._pop()
+        if cmd == "h":
+            x += self.current_position.real
+        self.current_position = complex(x, self.current_position.imag)
+        self._emit_point(self.current_position)
 
     def _handle_vertical_line_to(self, cmd):
         """
@@ -93,9 +342,11 @@ class PathParser:
         Args:
             cmd (str): The SVG command ('V' or 'v').
         """
-        y = float(self.commands.pop(0))
-        self.current_position[1] = self.current_position[1] + y if cmd == "v" else y
-        self.points.append(tuple(self.current_position))
+        y = self._pop()
+        if cmd == "v":
+            y += self.current_position.imag
+        self.current_position = complex(self.current_position.real, y)
+        self._emit_point(self.current_position)
 
     def _handle_cubic_bezier(self, cmd):
         """
@@ -104,12 +355,10 @@ class PathParser:
         Args:
             cmd (str): The SVG command ('C' or 'c').
         """
-        x1, y1, x2, y2, x, y = (float(self.commands.pop(0)) for _ in range(6))
-        if cmd == "c":
-            x1, y1, x2, y2, x, y = [v + self.current_position[i % 2] for i, v in enumerate([x1, y1, x2, y2, x, y])]
-        bezier_points = self.generate_cubic_bezier_points(self.current_position, [x1, y1, x2, y2, x, y])
-        self.points.extend(bezier_points)
-        self.current_position, self.control_point = [x, y], [x2, y2]
+        relative = cmd == "c"
+        c1, c2, end = self._pop_point(relative), self._pop_point(relative), self._pop_point(relative)
+        self._queue_cubic(self.current_position, c1, c2, end)
+        self.current_position, self.control_point = end, c2
 
     def _handle_smooth_cubic_bezier(self, cmd):
         """
@@ -118,16 +367,14 @@ class PathParser:
         Args:
             cmd (str): The SVG command ('S' or 's').
         """
-        if self.last_command not in "CcSs":
-            self.control_point = self.current_position
+        if self.last_command not in _CUBIC_COMMANDS:
+            c1 = self.current_position
         else:
-            self.control_point = [2 * self.current_position[i] - self.control_point[i] for i in range(2)]
-        x2, y2, x, y = (float(self.commands.pop(0)) for _ in range(4))
-        if cmd == "s":
-            x2, y2, x, y = [v + self.current_position[i % 2] for i, v in enumerate([x2, y2, x, y])]
-        bezier_points = self.generate_cubic_bezier_points(self.current_position, [*self.control_point, x2, y2, x, y])
-        self.points.extend(bezier_points)
-        self.current_position, self.control_point = [x, y], [x2, y2]
+            c1 = 2 * self.current_position - self.control_point
+        relative = cmd == "s"
+        c2, end = self._pop_point(relative), self._pop_point(relative)
+        self._queue_cubic(self.current_position, c1, c2, end)
+        self.current_position, self.control_point = end, c2
 
     def _handle_quadratic_bezier(self, cmd):
         """
@@ -136,12 +383,10 @@ class PathParser:
         Args:
             cmd (str): The SVG command ('Q' or 'q').
         """
-        x1, y1, x, y = (float(self.commands.pop(0)) for _ in range(4))
-        if cmd == "q":
-            x1, y1, x, y = [v + self.current_position[i % 2] for i, v in enumerate([x1, y1, x, y])]
-        bezier_points = self.generate_quadratic_bezier_points(self.current_position, [x1, y1, x, y])
-        self.points.extend(bezier_points)
-        self.current_position, self.control_point = [x, y], [x1, y1]
+        relative = cmd == "q"
+        control, end = self._pop_point(relative), self._pop_point(relative)
+        self._queue_quadratics((self.current_position,), (control,), (end,), self.tolerance)
+        self.current_position, self.control_point = end, control
 
     def _handle_smooth_quadratic_bezier(self, cmd):
         """
@@ -150,16 +395,13 @@ class PathParser:
         Args:
             cmd (str): The SVG command ('T' or 't').
         """
-        if self.last_command not in "QqTt":
-            self.control_point = self.current_position
+        if self.last_command not in _QUADRATIC_COMMANDS:
+            control = self.current_position
         else:
-            self.control_point = [2 * self.current_position[i] - self.control_point[i] for i in range(2)]
-        x, y = float(self.commands.pop(0)), float(self.commands.pop(0))
-        if cmd == "t":
-            x, y = [v + self.current_position[i % 2] for i, v in enumerate([x, y])]
-        bezier_points = self.generate_quadratic_bezier_points(self.current_position, [*self.control_point, x, y])
-        self.points.extend(bezier_points)
-        self.current_position = [x, y]
+            control = 2 * self.current_position - self.control_point
+        end = self._pop_point(cmd == "t")
+        self._queue_quadratics((self.current_position,), (control,), (end,), self.tolerance)
+        self.current_position, self.control_point = end, control
 
     def _handle_arc(self, cmd):
         """
@@ -168,121 +410,85 @@ class PathParser:
         Args:
             cmd (str): The SVG command ('A' or 'a').
         """
-        rx, ry, x_rot, large_arc, sweep, x, y = (float(self.commands.pop(0)) if i < 5 else int(self.commands.pop(0)) for
-                                                 i in range(7))
-        if cmd == "a":
-            x, y = x + self.current_position[0], y + self.current_position[1]
-        arc_points = self.generate_arc_points(self.current_position, rx, ry, x_rot, large_arc, sweep, [x, y])
-        self.points.extend(arc_points)
-        self.current_position = [x, y]
-
-    def _handle_close_path(self):
+        rx, ry, x_rot, large_arc, sweep = (self._pop() for _ in range(5))
+        end = self._pop_point(cmd == "a")
+        arc_points = self.generate_arc_points(self.current_position, rx, ry, x_rot, int(large_arc), int(sweep), end,
+                                              self.tolerance)
+        self._emit(arc_points)
+        self.current_position = end
+
+    def _handle_close_path(self, cmd):
         """
-        Processes Z/z commands to close the current path.
+        Processes Z/z commands to close the current subpath.
+
+        Drawing continues from the start of the closed subpath.
+
+        Args:
+            cmd (str): The SVG command ('Z' or 'z').
         """
-        self.points.append(self.points[0])
+        if self.n_points > self.subpath_start:
+            self.current_position = complex(self.points[self.subpath_start])
+            self._emit_point(self.current_position)
+        self._start_subpath()
 
     @staticmethod
-    def generate_cubic_bezier_points(start_point, control_points):
+    def generate_cubic_bezier_points(p0, p1, p2, p3, tolerance=TOLERANCE):
         """
         Generates points for a cubic Bezier curve.
 
+        The cubic is approximated by a few quadratics, which are then flattened.
+
         Args:
-            start_point (list[float]): Starting point [x, y].
-            control_points (list[float]): Control points and end point [x1, y1, x2, y2, x3, y3].
+            p0 (complex): Starting point.
+            p1 (complex): First control point.
+            p2 (complex): Second control point.
+            p3 (complex): End point.
+            tolerance (float): Maximum distance between the polyline and the curve.
 
         Returns:
-            list[tuple]: Points along the cubic Bezier curve.
+            numpy.ndarray: Complex points along the cubic Bezier curve.
         """
-
-        x1, y1, x2, y2, x3, y3 = control_points
-        bezier_points = []
-        for t in [i / 10 for i in range(11)]:
-            bx = (1 - t) ** 3 * start_point[0] + 3 * (1 - t) ** 2 * t * x1 + 3 * (1 - t) * t ** 2 * x2 + t ** 3 * x3
-            by = (1 - t) ** 3 * start_point[1] + 3 * (1 - t) ** 2 * t * y1 + 3 * (1 - t) * t ** 2 * y2 + t ** 3 * y3
-            bezier_points.append((bx, by))
-        return bezier_points
+        quadratics = _path_kernels.cubic_to_quadratics(p0, p1, p2, p3, CUBIC_TO_QUADRATIC_TOLERANCE * tolerance,
+                                                       MAX_SEGMENTS)
+        tolerances = np.full(len(quadratics[0]), (1 - CUBIC_TO_QUADRATIC_TOLERANCE) * tolerance)
+        points = _path_kernels.flatten_quadratics(*quadratics, tolerances, MAX_SEGMENTS)
+        return np.concatenate(([p0], points))
 
     @staticmethod
-    def generate_quadratic_bezier_points(start_point, control_points):
+    def generate_quadratic_bezier_points(p0, p1, p2, tolerance=TOLERANCE):
         """
         Generates points for a quadratic Bezier curve.
 
         Args:
-            start_point (list[float]): Starting point [x, y].
-            control_points (list[float]): Control point and end point [x1, y1, x2, y2].
+            p0 (complex): Starting point.
+            p1 (complex): Control point.
+            p2 (complex): End point.
+            tolerance (float): Maximum distance between the polyline and the curve.
 
         Returns:
-            list[tuple]: Points along the quadratic Bezier curve.
+            numpy.ndarray: Complex points along the quadratic Bezier curve.
         """
-        x1, y1, x2, y2 = control_points
-        bezier_points = []
-        for t in [i / 10 for i in range(11)]:
-            bx = (1 - t) ** 2 * start_point[0] + 2 * (1 - t) * t * x1 + t ** 2 * x2
-            by = (1 - t) ** 2 * start_point[1] + 2 * (1 - t) * t * y1 + t ** 2 * y2
-            bezier_points.append((bx, by))
-        return bezier_points
+        points = _path_kernels.flatten_quadratics(np.array([p0]), np.array([p1]), np.array([p2]), np.array([tolerance]),
+                                                  MAX_SEGMENTS)
+        return np.concatenate(([p0], points))
 
     @staticmethod
-    def generate_arc_points(start_point, rx, ry, x_rot, large_arc, sweep, end_point):
+    def generate_arc_points(start_point, rx, ry, x_rot, large_arc, sweep, end_point, tolerance=TOLERANCE):
         """
         Generates points for an elliptical arc.
 
         Args:
-            start_point (list[float]): Starting point [x, y].
+            start_point (complex): Starting point.
             rx (float): X-axis radius.
             ry (float): Y-axis radius.
             x_rot (float): Rotation of the ellipse in degrees.
             large_arc (int): Flag for large arc (1 = true, 0 = false).
             sweep (int): Flag for arc direction (1 = clockwise, 0 = counterclockwise).
-            end_point (list[float]): Ending point [x, y].
+            end_point (complex): Ending point.
+            tolerance (float): Maximum distance between the polyline and the arc.
 
         Returns:
-            list[tuple]: Points along the elliptical arc.
+            numpy.ndarray: Complex points along the elliptical arc.
         """
-        from math import cos, sin, radians, sqrt, atan2, pi
-
-        x_rot = radians(x_rot)
-
-        x1, y1 = start_point
-        x2, y2 = end_point
-
-        dx = (x1 - x2) / 2.0
-        dy = (y1 - y2) / 2.0
-
-        x1p = cos(x_rot) * dx + sin(x_rot) * dy
-        y1p = -sin(x_rot) * dx + cos(x_rot) * dy
-
-        rx_sq = rx ** 2
-        ry_sq = ry ** 2
-        x1p_sq = x1p ** 2
-        y1p_sq = y1p ** 2
-
-        radicand = max(0, int((rx_sq * ry_sq - rx_sq * y1p_sq - ry_sq * x1p_sq) /
-                              (rx_sq * y1p_sq + ry_sq * x1p_sq)))
-        c = sqrt(radicand) if large_arc != sweep else -sqrt(radicand)
-
-        cxp = c * (rx * y1p) / ry
-        cyp = c * -(ry * x1p) / rx
-
-        cx = cos(x_rot) * cxp - sin(x_rot) * cyp + (x1 + x2) / 2
-        cy = sin(x_rot) * cxp + cos(x_rot) * cyp + (y1 + y2) / 2
-
-        theta1 = atan2((y1p - cyp) / ry, (x1p - cxp) / rx)
-        delta_theta = atan2((-y1p - cyp) / ry, (-x1p - cxp) / rx) - theta1
-
-        if not sweep:
-            delta_theta -= 2 * pi
-        elif sweep:
-            delta_theta = (delta_theta + 2 * pi) % (2 * pi)
-
-        num_points = 10
-        arc_points = []
-        for i in range(num_points + 1):
-            t = i / num_points
-            theta = theta1 + t * delta_theta
-            x = cx + rx * cos(theta) * cos(x_rot) - ry * sin(theta) * sin(x_rot)
-            y = cy + rx * cos(theta) * sin(x_rot) + ry * sin(theta) * cos(x_rot)
-            arc_points.append((x, y))
-
-        return arc_points
+        return _path_kernels.arc_points(complex(start_point), float(rx), float(ry), float(x_rot), int(large_arc),
+                                        int(sweep), complex(end_point), tolerance, MAX_SEGMENTS)
@@ -1,206 +1,525 @@
+from functools import lru_cache
+from operator import attrgetter
+
+import numpy as np
 from PIL import Image, ImageDraw
-from scripts.path_parser import PathParser
+from scripts import _aggdraw_backend
+from scripts.path_parser import _NUMBER_RE, PathParser
+
+# Below this many characters of point data, NumPy's call overhead outweighs its conversion speed.
+NUMPY_POINTS_MIN_LENGTH = 256
+
+# Number of distinct flattened paths kept in memory.
+PATH_CACHE_SIZE = 1024
+
+# Element fields read together, fetched in one call each.
+_SHAPE_STYLE = attrgetter('fill', 'stroke', 'stroke_width')
+_STROKE_STYLE = attrgetter('stroke', 'stroke_width')
+_RECT_BOX = attrgetter('x', 'y', 'width', 'height')
+_CIRCLE_BOX = attrgetter('cx', 'cy', 'r')
+_ELLIPSE_BOX = attrgetter('cx', 'cy', 'rx', 'ry')
+_LINE_ENDS = attrgetter('x1', 'y1', 'x2', 'y2')
+
+
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def _flatten_path(path_data, tolerance):
+    """
+    Flattens path data into subpaths, reusing the result for repeated paths.
+
+    SVG files often repeat the same 'd' attribute (icons, markers, patterns), and a
+    path always flattens to the same points, so they are parsed only once.
+
+    Args:
+        path_data (str): SVG path data string.
+        tolerance (float): Maximum distance between the flattened and the true curve.
+
+    Returns:
+        tuple[numpy.ndarray]: One read-only array of (x, y) coordinates per subpath.
+    """
+    subpaths = PathParser(path_data, tolerance).parse()
+    for points in subpaths:
+        points.flags.writeable = False
+    return tuple(subpaths)
+
 
 class Renderer:
     """
        A class to render SVG-like elements onto a PNG image.
 
        This class supports rendering various geometric shapes such as rectangles,
-       circles, lines, ellipses, and paths. The elements are provided as dictionaries
-       and rendered dynamically based on their type.
+       circles, lines, ellipses, and paths. The elements are provided as the element
+       tuples produced by the SVG parser and rendered dynamically based on their type.
+
+       Coordinates are multiplied by `scale * supersample` while drawing. With
+       supersampling the canvas is drawn larger and downsampled when saved, which
+       antialiases edges at the cost of more rasterization work. The 'aggdraw' backend
+       antialiases edges as it draws, usually faster than supersampling.
 
        Attributes:
-           width (int): Width of the rendered image.
-           height (int): Height of the rendered image.
+           width (int): Width of the SVG canvas.
+           height (int): Height of the SVG canvas.
+           scale (float): Scaling factor for the output resolution.
+           supersample (int): Antialiasing factor applied on top of `scale`.
+           factor (float): Total factor from SVG units to canvas pixels.
+           tolerance (float): Maximum distance in SVG units between flattened and true curves,
+               corresponding to PathParser.TOLERANCE canvas pixels.
            image (Image): The Pillow Image object where elements are drawn.
-           elements_supported (list): List of supported element types.
-           draw (ImageDraw): The Pillow ImageDraw object used for drawing.
+           elements_supported (frozenset): Set of supported element types.
+           backend (str): The library drawing the elements, 'pillow' or 'aggdraw'.
+           draw (ImageDraw or AggDraw): The object used for drawing, with ImageDraw's methods.
        """
 
-    def __init__(self, width, height, scale=2, elements_supported=None):
+    def __init__(self, width, height, scale=1, elements_supported=None, *, supersample=1, backend='pillow'):
         """
         Initializes the Renderer with a blank image and supported elements.
 
         Args:
-            width (int): Width of the image.
-            height (int): Height of the image.
+            width (int): Width of the SVG canvas.
+            height (int): Height of the SVG canvas.
+            scale (float): Scaling factor for the output resolution.
             elements_supported (list[str], optional): A list of element types that
                 the renderer supports. If None, the default supported elements
                 are ['rect', 'circle', 'line', 'ellipse', 'path', 'polyline'].
+            supersample (int): Antialiasing factor. 1 draws directly at the output resolution.
+            backend (str): 'pillow' draws with Pillow's ImageDraw. 'aggdraw' draws with
+                antialiased edges through aggdraw, which must be installed.
+
+        Raises:
+            ValueError: If the backend is unknown.
+            ImportError: If the 'aggdraw' backend is requested but aggdraw is not installed.
         """
 
         self.width = width
         self.height = height
-        self.image = Image.new('RGBA', (int(width * scale), int(height * scale)), (255, 255, 255, 0))
-        self.elements_supported = elements_supported
-        if self.elements_supported is None:
-            self.elements_supported = elements_supported
-        self.elements_supported = ['rect', 'circle', 'line', 'ellipse', 'path', 'polyline']
-        self.draw = ImageDraw.Draw(self.image, 'RGBA')
+        self.scale = scale
+        self.supersample = supersample
+        self.factor = scale * supersample
+        self.tolerance = PathParser.TOLERANCE / self.factor
+        self.image = Image.new('RGBA', (int(width * self.factor), int(height * self.factor)), (255, 255, 255, 0))
+        if elements_supported is None:
+            elements_supported = ['rect', 'circle', 'line', 'ellipse', 'path', 'polyline']
+        self.elements_supported = frozenset(elements_supported)
+        self.backend = backend
+        if backend == 'pillow':
+            self.draw = ImageDraw.Draw(self.image, 'RGBA')
+        elif backend == 'aggdraw':
+            if not _aggdraw_backend.HAVE_AGGDRAW:
+                raise ImportError("The 'aggdraw' backend requires the aggdraw package.")
+            self.draw = _aggdraw_backend.AggDraw(self.image)
+        else:
+            raise ValueError(f"Unknown backend '{backend}'.")
+
+        self._dispatch = {}
+        for element_type in self.elements_supported:
+            draw_function = getattr(self, f"draw_{element_type}", None)
+            if callable(draw_function):
+                self._dispatch[element_type] = draw_function
+            else:
+                print(f"Function '{element_type}' is not defined.")
+
+        # Elements whose stroke can be batched with neighbours of the same style.
+        self._stroke_geometry = {'line': self._line_geometry, 'polyline': self._polyline_geometry,
+                                 'path': self._path_geometry}
+        # Shapes batched with neighbours drawn by the same drawing method in the same style.
+        self._shape_geometry = {'rect': (self.draw.rectangle, self._rect_geometry),
+                                'circle': (self.draw.ellipse, self._circle_geometry),
+                                'ellipse': (self.draw.ellipse, self._ellipse_geometry)}
 
     def draw_elements(self, elements):
         """
         Iterates over the list of elements and draws them based on their type.
 
+        Runs of consecutive elements that can share one style are gathered and drawn
+        together: rectangles, or circles and ellipses, with the same fill, stroke and
+        stroke width, and unfilled lines, polylines and paths with the same stroke and
+        stroke width. Drawing order is preserved. Lines, polylines and paths with neither
+        fill nor stroke draw nothing.
+
         Args:
-            elements (list[dict]): A list of element dictionaries containing type
-                and attributes (e.g., rect, circle, line).
+            elements (list[tuple]): Parsed elements (e.g., RectElement, CircleElement,
+                LineElement), each with a `type` naming the kind of element.
 
         Returns:
             Image: The updated Pillow Image object.
         """
+        dispatch = self._dispatch
+        stroke_geometry = self._stroke_geometry
+        shape_geometry = self._shape_geometry
+        batch, batch_key = [], None
         for element in elements:
-            element_type = element['type']
-            if element['type'] in self.elements_supported:
-                draw_function = getattr(self, f"draw_{element_type}", None)
-                if callable(draw_function):
-                    draw_function(element)
-                else:
-                    print(f"Function '{element_type}' is not defined.")
+            element_type = element.type
+            draw_function = dispatch.get(element_type)
+            if draw_function is None:
+                continue
+            if element_type in shape_geometry:
+                key = (shape_geometry[element_type][0], element.fill, element.stroke, element.stroke_width)
+            elif element_type in stroke_geometry and not element.fill:
+                key = ('line', None, element.stroke, element.stroke_width)
+            else:
+                key = None
+            if key != batch_key:
+                self._draw_batch(batch, batch_key)
+                batch, batch_key = [], key
+            if key is None:
+                draw_function(element)
+            else:
+                batch.append(element)
+        self._draw_batch(batch, batch_key)
+        self._flush()
         return self.image
 
+    def _draw_batch(self, elements, key):
+        """
+        Draws a run of elements sharing the same drawing method and style.
+
+        Args:
+            elements (list[tuple]): The elements to draw.
+            key (tuple): The shared (method, fill, stroke, stroke_width) of the elements,
+                where method is the drawing method, or 'line' for unfilled strokes.
+        """
+        if not elements:
+            return
+        method, fill, stroke, width = key
+        width = self._scale_width(width)
+        if method == 'line':
+            # With stroke="none" there is nothing to draw. Before batching, these shapes
+            # were drawn with fill=None, which ImageDraw paints in its default ink, white.
+            if stroke is None or width <= 0:
+                return
+            stroke_geometry = self._stroke_geometry
+            line = self.draw.line
+            for element in elements:
+                for points in stroke_geometry[element.type](element):
+                    line(points, fill=stroke, width=width)
+            return
+
+        shape_geometry = self._shape_geometry
+        for element in elements:
+            method(shape_geometry[element.type][1](element), fill=fill, outline=stroke, width=width)
+
     def draw_rect(self, element):
         """
         Draws a rectangle on the image.
 
         Args:
-            element (dict): Attributes of the rectangle, including:
-                - 'x' (float): Top-left x-coordinate.
-                - 'y' (float): Top-left y-coordinate.
-                - 'width' (float): Width of the rectangle.
-                - 'height' (float): Height of the rectangle.
-                - 'fill' (str): Fill color.
-                - 'stroke' (str): Stroke color.
+            element (RectElement): The rectangle to draw.
         """
-        x = element['x']
-        y = element['y']
-        w = element['width']
-        h = element['height']
-        fill = element['fill']
-        stroke = element['stroke']
-        width = element['stroke-width']
-
-        self.draw.rectangle([x, y, x + w, y + h], fill=fill, outline=stroke, width=width)
+        fill, stroke, width = _SHAPE_STYLE(element)
+        self.draw.rectangle(self._rect_geometry(element), fill=fill, outline=stroke, width=self._scale_width(width))
 
     def draw_circle(self, element):
         """
         Draws a circle on the image.
 
         Args:
-            element (dict): Attributes of the circle, including:
-                - 'cx' (float): X-coordinate of the center.
-                - 'cy' (float): Y-coordinate of the center.
-                - 'r' (float): Radius of the circle.
-                - 'fill' (str): Fill color.
-                - 'stroke' (str): Stroke color.
+            element (CircleElement): The circle to draw.
         """
 
-        cx = element['cx']
-        cy = element['cy']
-        r = element['r']
-        fill = element['fill']
-        stroke = element['stroke']
-        width = element['stroke-width']
-        self.draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=fill, outline=stroke, width=width)
+        fill, stroke, width = _SHAPE_STYLE(element)
+        self.draw.ellipse(self._circle_geometry(element), fill=fill, outline=stroke, width=self._scale_width(width))
 
     def draw_line(self, element):
         """
         Draws a line on the image.
 
         Args:
-            element (dict): Attributes of the line, including:
-                - 'x1' (float): Start x-coordinate.
-                - 'y1' (float): Start y-coordinate.
-                - 'x2' (float): End x-coordinate.
-                - 'y2' (float): End y-coordinate.
-                - 'stroke' (str): Line color.
-                - 'width' (int): Line width.
+            element (LineElement): The line to draw.
         """
 
-        x1 = element['x1']
-        y1 = element['y1']
-        x2 = element['x2']
-        y2 = element['y2']
-        stroke = element['stroke']
-        width = element['stroke-width']
-        self.draw.line([x1, y1, x2, y2], fill=stroke, width=width)
+        stroke, width = _STROKE_STYLE(element)
+        width = self._scale_width(width)
+
+        if stroke and width > 0:
+            for points in self._line_geometry(element):
+                self.draw.line(points, fill=stroke, width=width)
 
     def draw_ellipse(self, element):
         """
         Draws an ellipse on the image.
 
         Args:
-            element (dict): Attributes of the ellipse, including:
-                - 'cx' (float): X-coordinate of the center.
-                - 'cy' (float): Y-coordinate of the center.
-                - 'rx' (float): Radius on the x-axis.
-                - 'ry' (float): Radius on the y-axis.
-                - 'fill' (str): Fill color.
-                - 'stroke' (str): Stroke color.
+            element (EllipseElement): The ellipse to draw.
         """
-        cx = element['cx']
-        cy = element['cy']
-        rx = element['rx']
-        ry = element['ry']
-        stroke = element['stroke']
-        fill = element['fill']
-        width = element['stroke-width']
-        self.draw.ellipse([cx - rx, cy - ry, cx + rx, cy + ry], fill=fill, outline=stroke, width=width)
+        fill, stroke, width = _SHAPE_STYLE(element)
+        self.draw.ellipse(self._ellipse_geometry(element), fill=fill, outline=stroke, width=self._scale_width(width))
 
     def draw_polyline(self, element):
         """
         Draws a polyline on the image.
 
         Args:
-            element (dict): Attributes:
-                - 'points' (str): Comma-separated coordinates ("x1,y1 x2,y2").
-                - 'stroke' (str): Line color.
-                - 'fill' (str): Fill color or None.
-                - 'stroke-width' (int): Line width.
+            element (PolylineElement): The polyline to draw.
         """
 
-        points = element['points'].split(' ')
-        points = list(map(lambda x: (float(x.split(',')[0]), float(x.split(',')[1])), points))
+        fill, stroke, width = _SHAPE_STYLE(element)
+        width = self._scale_width(width)
 
-        stroke = element['stroke']
-        fill = element['fill']
-        width = element['stroke-width']
-
-        if fill:
-            self.draw.polygon(points, fill=fill)
-        if stroke:
-            self.draw.line(points, fill=stroke, width=width)
+        if fill or (stroke and width > 0):
+            self._fill_and_stroke(self._polyline_geometry(element), fill, stroke, width)
 
     def draw_path(self, element):
         """
         Draws a path using SVG commands.
 
         Args:
-            element (dict): Attributes:
-                - 'd' (str): Path data (SVG format).
-                - 'stroke' (str): Outline color.
-                - 'fill' (str): Fill color or None.
-                - 'stroke-width' (int): Line width.
+            element (PathElement): The path to draw.
+        """
+        fill, stroke, width = _SHAPE_STYLE(element)
+        width = self._scale_width(width)
+
+        if fill or (stroke and width > 0):
+            self._fill_and_stroke(self._path_geometry(element), fill, stroke, width)
+
+    def _fill_and_stroke(self, subpaths, fill, stroke, width):
+        """
+        Fills and strokes a list of subpaths.
+
+        The subpaths are filled together as one shape, so that an inner subpath winding
+        the other way leaves a hole, and each subpath is then stroked on its own.
+
+        A single closed subpath with a 1 pixel stroke is filled and outlined by one polygon
+        call. Pillow draws wider polygon outlines inside the shape, while SVG centers
+        strokes on the outline as a line does, so wider strokes are drawn separately.
+
+        Args:
+            subpaths (list[list]): Flat coordinate lists in canvas pixels.
+            fill (tuple or None): Fill color.
+            stroke (tuple or None): Stroke color.
+            width (int): Stroke width in pixels; 0 draws no stroke.
+        """
+        draw = self.draw
+        if width <= 0:
+            stroke = None
+        if fill and len(subpaths) > 1:
+            self._fill_rings(subpaths, fill)
+            fill = None
+        for points in subpaths:
+            if fill and stroke and width == 1 and stroke != fill and points[:2] == points[-2:]:
+                draw.polygon(points, fill=fill, outline=stroke, width=1)
+                continue
+            if fill:
+                draw.polygon(points, fill=fill)
+            if stroke:
+                draw.line(points, fill=stroke, width=width)
+
+    def _fill_rings(self, subpaths, fill):
+        """
+        Fills several subpaths as one shape, following SVG's nonzero fill rule.
+
+        aggdraw fills a path of several parts this way itself. With Pillow, each subpath
+        is rasterized on its own and counted +1 or -1 by the direction it winds, and the
+        pixels whose count is not zero are filled.
+
+        Args:
+            subpaths (list[list]): Flat coordinate lists in canvas pixels.
+            fill (tuple): Fill color.
+        """
+        if self.backend == 'aggdraw':
+            self.draw.fill_rings(subpaths, fill)
+            return
+
+        rings = [np.array(points).reshape(-1, 2) for points in subpaths]
+        corners = np.concatenate(rings)
+        origin = np.maximum(np.floor(corners.min(axis=0)), 0).astype(int)
+        end = np.minimum(np.ceil(corners.max(axis=0)) + 1, self.image.size).astype(int)
+        if np.any(end <= origin):
+            return
+        winding = np.zeros((end[1] - origin[1], end[0] - origin[0]), np.int32)
+        for ring in rings:
+            x, y = ring[:, 0], ring[:, 1]
+            # Twice the signed area; its sign gives the direction the subpath winds.
+            area = np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))
+            low = np.maximum(np.floor(ring.min(axis=0)), origin).astype(int)
+            high = np.minimum(np.ceil(ring.max(axis=0)) + 1, end).astype(int)
+            if area == 0 or np.any(high <= low):
+                continue
+            mask = Image.new('L', tuple(high - low))
+            ImageDraw.Draw(mask).polygon((ring - low).ravel().tolist(), fill=1)
+            window = winding[low[1] - origin[1]:high[1] - origin[1], low[0] - origin[0]:high[0] - origin[0]]
+            if area > 0:
+                window += np.asarray(mask)
+            else:
+                window -= np.asarray(mask)
+        mask = Image.fromarray(np.where(winding != 0, 255, 0).astype(np.uint8))
+        self.draw.bitmap(tuple(origin.tolist()), mask, fill=fill)
+
+    def _rect_geometry(self, element):
+        """
+        Returns the canvas bounding box of a rect element.
+
+        Args:
+            element (RectElement): The rectangle.
+
+        Returns:
+            list[float]: The [x0, y0, x1, y1] corners of the rectangle.
+        """
+        x, y, width, height = _RECT_BOX(element)
+        f = self.factor
+        return [x * f, y * f, (x + width) * f, (y + height) * f]
+
+    def _circle_geometry(self, element):
+        """
+        Returns the canvas bounding box of a circle element.
+
+        Args:
+            element (CircleElement): The circle.
+
+        Returns:
+            list[float]: The [x0, y0, x1, y1] corners of the circle's bounding box.
+        """
+        cx, cy, r = _CIRCLE_BOX(element)
+        f = self.factor
+        return [(cx - r) * f, (cy - r) * f, (cx + r) * f, (cy + r) * f]
+
+    def _ellipse_geometry(self, element):
+        """
+        Returns the canvas bounding box of an ellipse element.
+
+        Args:
+            element (EllipseElement): The ellipse.
+
+        Returns:
+            list[float]: The [x0, y0, x1, y1] corners of the ellipse's bounding box.
+        """
+        cx, cy, rx, ry = _ELLIPSE_BOX(element)
+        f = self.factor
+        return [(cx - rx) * f, (cy - ry) * f, (cx + rx) * f, (cy + ry) * f]
+
+    def _line_geometry(self, element):
+        """
+        Returns the canvas coordinates of a line element.
+
+        Args:
+            element (LineElement): The line.
+
+        Returns:
+            list[list]: A single flat coordinate list holding both ends of the line.
+        """
+        x1, y1, x2, y2 = _LINE_ENDS(element)
+        f = self.factor
+        return [[x1 * f, y1 * f, x2 * f, y2 * f]]
+
+    def _polyline_geometry(self, element):
+        """
+        Returns the canvas coordinates of a polyline element.
+
+        Args:
+            element (PolylineElement): The polyline.
+
+        Returns:
+            list[list]: A single flat coordinate list with the polyline vertices, or no list
+                if the polyline has fewer than two points and so draws nothing.
+        """
+        points = self._parse_points(element.points)
+        return [points] if len(points) >= 4 else []
+
+    def _path_geometry(self, element):
+        """
+        Flattens a path element into canvas coordinates.
+
+        Args:
+            element (PathElement): The path.
+
+        Returns:
+            list[list]: One flat coordinate list per subpath.
+        """
+        return [self._scale_points(points) for points in _flatten_path(element.d, self.tolerance)]
+
+    def _parse_points(self, data):
+        """
+        Parses a polyline 'points' attribute into scaled canvas coordinates.
+
+        Numbers are read as in path data, so they may be separated by commas and/or
+        whitespace or run together ("10-20"), and anything else is skipped. A trailing
+        unpaired coordinate is ignored.
+
+        Args:
+            data (str): The points attribute ("x1,y1 x2,y2 ...").
+
+        Returns:
+            list[float]: Flat [x1, y1, x2, y2, ...] coordinates in canvas pixels.
         """
-        path_data = element['d']
-        stroke = element['stroke']
-        fill = element['fill']
-        width = element['stroke-width']
+        values = _NUMBER_RE.findall(data)
+        values = values[:len(values) // 2 * 2]
+        if len(data) < NUMPY_POINTS_MIN_LENGTH:
+            f = self.factor
+            return [float(value) * f for value in values]
 
-        parser = PathParser(path_data)
-        points = parser.parse()
-        if fill:
-            self.draw.polygon(points, fill=fill)
-        if stroke:
-            self.draw.line(points, fill=stroke, width=width)
+        return self._scale_points(np.array(values, dtype=float))
 
-    def save_PNG(self, filename):
+    def _scale_points(self, points):
+        """
+        Converts points from SVG units to canvas pixels.
+
+        Pillow accepts coordinates as a flat [x1, y1, x2, y2, ...] sequence, which
+        avoids building a tuple per point.
+
+        Args:
+            points (numpy.ndarray): (x, y) coordinates, of shape (n, 2) or already flat.
+
+        Returns:
+            list[float]: The scaled coordinates as a flat list.
+        """
+        f = self.factor
+        return (points * f if f != 1 else points).ravel().tolist()
+
+    def _scale_width(self, width):
+        """
+        Converts a stroke width from SVG units to canvas pixels.
+
+        Args:
+            width (float): Stroke width in SVG units.
+
+        Returns:
+            int: Stroke width in pixels, as expected by Pillow.
+        """
+        return int(round(width * self.factor))
+
+    def _flush(self):
+        """
+        Writes pending drawing into the image. Only the 'aggdraw' backend draws into a
+        buffer of its own.
+        """
+        if self.backend == 'aggdraw':
+            self.draw.flush()
+
+    def _output_image(self):
+        """
+        Returns the image at the output resolution, downsampling a supersampled canvas.
+
+        Returns:
+            Image: The Pillow Image object to export.
+        """
+        self._flush()
+        if self.supersample > 1:
+            return self.image.resize((int(self.width * self.scale), int(self.height * self.scale)), Image.LANCZOS)
+        return self.image
+
+    def to_rgba_bytes(self):
+        """
+        Returns the raw RGBA pixels of the rendered image, skipping PNG encoding.
+
+        Returns:
+            tuple[bytes, tuple[int, int]]: The pixel data, row by row, and the (width, height) of the image.
+        """
+        image = self._output_image()
+        return image.tobytes(), image.size
+
+    def save_PNG(self, filename, compress_level=1):
         """
         Saves the current image as a PNG file.
 
+        A supersampled canvas is downsampled to the output resolution first.
+        A fully opaque image is written as RGB, since its alpha channel carries no information.
+
         Args:
-            filename (str): The name of the file to save the image to.
+            filename (str or file object): The name of the file to save the image to,
+                or a binary file object (e.g. io.BytesIO) to write it into.
+            compress_level (int): zlib compression level from 0 to 9. Lower levels
+                encode faster and produce larger files.
         """
 
-        self.image.save(filename)
-        print("Successfully convert SVG file to PNG.")
+        image = self._output_image()
+        if image.getchannel('A').getextrema() == (255, 255):
+            image = image.convert('RGB')
+        image.save(filename, format='PNG', compress_level=compress_level, optimize=False)
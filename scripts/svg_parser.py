@@ -1,6 +1,147 @@
 import xml.etree.ElementTree as ET
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
 from PIL import ImageColor
 
+SVG_NAMESPACE = '{http://www.w3.org/2000/svg}'
+
+# Number of distinct color strings whose parsed value is kept.
+COLOR_CACHE_SIZE = 4096
+
+# A color as returned by Parser.parse_color.
+Color = Optional[Tuple[int, int, int, int]]
+
+
+class RectElement(NamedTuple):
+    """
+    A parsed rectangle.
+
+    Attributes:
+        x (float): Top-left x-coordinate.
+        y (float): Top-left y-coordinate.
+        width (float): Width of the rectangle.
+        height (float): Height of the rectangle.
+        fill (tuple or None): Fill color.
+        stroke (tuple or None): Stroke color.
+        stroke_width (int): Stroke width.
+    """
+    x: float
+    y: float
+    width: float
+    height: float
+    fill: Color
+    stroke: Color
+    stroke_width: int
+
+    type = 'rect'
+
+
+class CircleElement(NamedTuple):
+    """
+    A parsed circle.
+
+    Attributes:
+        cx (float): X-coordinate of the center.
+        cy (float): Y-coordinate of the center.
+        r (float): Radius of the circle.
+        fill (tuple or None): Fill color.
+        stroke (tuple or None): Stroke color.
+        stroke_width (int): Stroke width.
+    """
+    cx: float
+    cy: float
+    r: float
+    fill: Color
+    stroke: Color
+    stroke_width: int
+
+    type = 'circle'
+
+
+class LineElement(NamedTuple):
+    """
+    A parsed line. Lines have no interior, so their fill is always None.
+
+    Attributes:
+        x1 (float): Start x-coordinate.
+        y1 (float): Start y-coordinate.
+        x2 (float): End x-coordinate.
+        y2 (float): End y-coordinate.
+        stroke (tuple or None): Line color.
+        stroke_width (int): Line width.
+    """
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    stroke: Color
+    stroke_width: int
+
+    type = 'line'
+    fill = None
+
+
+class EllipseElement(NamedTuple):
+    """
+    A parsed ellipse.
+
+    Attributes:
+        cx (float): X-coordinate of the center.
+        cy (float): Y-coordinate of the center.
+        rx (float): Radius on the x-axis.
+        ry (float): Radius on the y-axis.
+        fill (tuple or None): Fill color.
+        stroke (tuple or None): Stroke color.
+        stroke_width (int): Stroke width.
+    """
+    cx: float
+    cy: float
+    rx: float
+    ry: float
+    fill: Color
+    stroke: Color
+    stroke_width: int
+
+    type = 'ellipse'
+
+
+class PathElement(NamedTuple):
+    """
+    A parsed path.
+
+    Attributes:
+        d (str): Path data (SVG format).
+        fill (tuple or None): Fill color.
+        stroke (tuple or None): Outline color.
+        stroke_width (int): Line width.
+    """
+    d: str
+    fill: Color
+    stroke: Color
+    stroke_width: int
+
+    type = 'path'
+
+
+class PolylineElement(NamedTuple):
+    """
+    A parsed polyline.
+
+    Attributes:
+        points (str): Comma-separated coordinates ("x1,y1 x2,y2").
+        fill (tuple or None): Fill color.
+        stroke (tuple or None): Line color.
+        stroke_width (int): Line width.
+    """
+    points: str
+    fill: Color
+    stroke: Color
+    stroke_width: int
+
+    type = 'polyline'
+
+
 class Parser:
     """
     A class to parse SVG files and extract supported geometric elements.
@@ -25,9 +166,28 @@ class Parser:
         self.path = path
         self.parsed_elements = ['rect', 'circle', 'line', 'ellipse', 'path', 'polyline']
 
+        # Tags are matched with and without the SVG namespace.
+        self._parse_functions = {}
+        for tag in self.parsed_elements:
+            parse_function = getattr(Parser, f"parse_{tag}", None)
+            if callable(parse_function):
+                self._parse_functions[tag] = parse_function
+                self._parse_functions[SVG_NAMESPACE + tag] = parse_function
+            else:
+                print(f"Function 'parse_{tag}' is not defined.")
+
     def extract_dimensions(self):
-        tree = ET.parse(self.path)
-        root = tree.getroot()
+        """
+        Reads the canvas size from the root element.
+
+        Only the opening tag of the root element is read, not the whole file.
+
+        Returns:
+            tuple[int, int]: The width and height of the SVG canvas.
+        """
+        with open(self.path, 'rb') as source:
+            for _, root in ET.iterparse(source, events=('start',)):
+                break
 
         width = root.attrib.get('width')
         height = root.attrib.get('height')
@@ -46,30 +206,35 @@ class Parser:
         """
         Parses the SVG file and extracts geometric elements.
 
+        The file is streamed, and each direct child of the root element is parsed and
+        then cleared once its closing tag is read, so the whole tree is never held in memory.
+
         Returns:
-            list[dict]: A list of dictionaries, each representing a geometric element.
+            list[tuple]: The parsed elements, as RectElement, CircleElement, LineElement,
+                EllipseElement, PathElement or PolylineElement instances.
 
         Raises:
             ValueError: If the SVG file cannot be read or parsed.
         """
 
+        parse_functions = self._parse_functions
+        elements = []
+        depth = 0
         try:
-            tree = ET.parse(self.path)
-            root = tree.getroot()
-        except Exception as e:
+            with open(self.path, 'rb') as source:
+                for event, element in ET.iterparse(source, events=('start', 'end')):
+                    if event == 'start':
+                        depth += 1
+                        continue
+                    depth -= 1
+                    if depth == 1:
+                        parse_function = parse_functions.get(element.tag)
+                        if parse_function is not None:
+                            elements.append(parse_function(element.attrib))
+                        element.clear()
+        except (ET.ParseError, OSError) as e:
             raise ValueError(f"Error on reading SVG file: {e}")
 
-        elements = []
-        for element in root:
-            tag = element.tag.split('}')[1]
-            attributes = element.attrib
-            if tag in self.parsed_elements:
-                parse_function = getattr(Parser, f"parse_{tag}", None)
-                if callable(parse_function):
-                    elements.append(parse_function(attributes))
-                else:
-                    print(f"Function 'parse_{tag}' is not defined.")
-
         return elements
 
     @staticmethod
@@ -81,19 +246,18 @@ class Parser:
             attributes (dict): The attributes of the rectangle element.
 
         Returns:
-            dict: A dictionary with rectangle attributes.
+            RectElement: The rectangle's attributes.
         """
 
-        return {
-            "type": "rect",
-            "x": float(attributes.get("x", 0)),
-            "y": float(attributes.get("y", 0)),
-            "width": float(attributes.get("width", 0)),
-            "height": float(attributes.get("height", 0)),
-            "stroke": Parser.parse_color(attributes.get("stroke", Parser.DEFAULT_COLOR)),
-            "stroke-width": int(attributes.get("stroke-width", 0)),
-            "fill": Parser.parse_color(attributes.get("fill", Parser.DEFAULT_COLOR))
-        }
+        return RectElement(
+            float(attributes.get("x", 0)),
+            float(attributes.get("y", 0)),
+            float(attributes.get("width", 0)),
+            float(attributes.get("height", 0)),
+            _parse_color(attributes.get("fill", Parser.DEFAULT_COLOR)),
+            _parse_color(attributes.get("stroke", Parser.DEFAULT_COLOR)),
+            int(attributes.get("stroke-width", 0))
+        )
 
     @staticmethod
     def parse_circle(attributes):
@@ -104,17 +268,16 @@ class Parser:
             attributes (dict): The attributes of the circle element.
 
         Returns:
-            dict: A dictionary with circle attributes.
-        """
-        return {
-            "type": "circle",
-            "cx": float(attributes.get("cx", 0)),
-            "cy": float(attributes.get("cy", 0)),
-            "r": float(attributes.get("r", 0)),
-            "fill": Parser.parse_color(attributes.get("fill", Parser.DEFAULT_COLOR)),
-            "stroke-width": int(attributes.get("stroke-width", 0)),
-            "stroke": Parser.parse_color(attributes.get("stroke", Parser.DEFAULT_COLOR))
-        }
+            CircleElement: The circle's attributes.
+        """
+        return CircleElement(
+            float(attributes.get("cx", 0)),
+            float(attributes.get("cy", 0)),
+            float(attributes.get("r", 0)),
+            _parse_color(attributes.get("fill", Parser.DEFAULT_COLOR)),
+            _parse_color(attributes.get("stroke", Parser.DEFAULT_COLOR)),
+            int(attributes.get("stroke-width", 0))
+        )
 
     @staticmethod
     def parse_line(attributes):
@@ -125,17 +288,16 @@ class Parser:
             attributes (dict): The attributes of the line element.
 
         Returns:
-            dict: A dictionary with line attributes.
-        """
-        return {
-            "type": "line",
-            "x1": float(attributes.get("x1", 0)),
-            "y1": float(attributes.get("y1", 0)),
-            "x2": float(attributes.get("x2", 0)),
-            "y2": float(attributes.get("y2", 0)),
-            "stroke-width": int(attributes.get("stroke-width", 0)),
-            "stroke": Parser.parse_color(attributes.get("stroke", Parser.DEFAULT_COLOR))
-        }
+            LineElement: The line's attributes.
+        """
+        return LineElement(
+            float(attributes.get("x1", 0)),
+            float(attributes.get("y1", 0)),
+            float(attributes.get("x2", 0)),
+            float(attributes.get("y2", 0)),
+            _parse_color(attributes.get("stroke", Parser.DEFAULT_COLOR)),
+            int(attributes.get("stroke-width", 0))
+        )
 
     @staticmethod
     def parse_ellipse(attributes):
@@ -146,18 +308,17 @@ class Parser:
             attributes (dict): The attributes of the ellipse element.
 
         Returns:
-            dict: A dictionary with ellipse attributes.
-        """
-        return {
-            "type": "ellipse",
-            "cx": float(attributes.get("cx", 0)),
-            "cy": float(attributes.get("cy", 0)),
-            "rx": float(attributes.get("rx", 0)),
-            "ry": float(attributes.get("ry", 0)),
-            "stroke": Parser.parse_color(attributes.get("stroke", Parser.DEFAULT_COLOR)),
-            "stroke-width": int(attributes.get("stroke-width", 0)),
-            "fill": Parser.parse_color(attributes.get("fill", Parser.DEFAULT_COLOR))
-        }
+            EllipseElement: The ellipse's attributes.
+        """
+        return EllipseElement(
+            float(attributes.get("cx", 0)),
+            float(attributes.get("cy", 0)),
+            float(attributes.get("rx", 0)),
+            float(attributes.get("ry", 0)),
+            _parse_color(attributes.get("fill", Parser.DEFAULT_COLOR)),
+            _parse_color(attributes.get("stroke", Parser.DEFAULT_COLOR)),
+            int(attributes.get("stroke-width", 0))
+        )
 
     @staticmethod
     def parse_path(attributes):
@@ -168,37 +329,35 @@ class Parser:
             attributes (dict): The attributes of the path element.
 
         Returns:
-            dict: A dictionary with path attributes.
+            PathElement: The path's attributes.
         """
         if not isinstance(attributes, dict):
             raise ValueError("Expected attributes to be a dictionary")
 
-        return {
-            "type": "path",
-            "d": attributes.get("d", ""),
-            "stroke": Parser.parse_color(attributes.get("stroke", Parser.DEFAULT_COLOR)),
-            "stroke-width": int(attributes.get("stroke-width", 0)),
-            "fill": Parser.parse_color(attributes.get("fill", Parser.DEFAULT_COLOR)),
-        }
+        return PathElement(
+            attributes.get("d", ""),
+            _parse_color(attributes.get("fill", Parser.DEFAULT_COLOR)),
+            _parse_color(attributes.get("stroke", Parser.DEFAULT_COLOR)),
+            int(attributes.get("stroke-width", 0))
+        )
 
     @staticmethod
     def parse_polyline(attributes):
         """
-        Parses the attributes of an SVG polyline element into a dictionary.
+        Parses the attributes of an SVG polyline element.
 
         Args:
             attributes (dict): The attributes of the polyline element.
 
         Returns:
-            dict: A dictionary with polyline attributes.
+            PolylineElement: The polyline's attributes.
         """
-        return {
-            "type": "polyline",
-            "points": attributes.get("points", ""),
-            "stroke": Parser.parse_color(attributes.get("stroke", Parser.DEFAULT_COLOR)),
-            "stroke-width": int(attributes.get("stroke-width", 0)),
-            "fill": Parser.parse_color(attributes.get("fill", Parser.DEFAULT_COLOR))
-        }
+        return PolylineElement(
+            attributes.get("points", ""),
+            _parse_color(attributes.get("fill", Parser.DEFAULT_COLOR)),
+            _parse_color(attributes.get("stroke", Parser.DEFAULT_COLOR)),
+            int(attributes.get("stroke-width", 0))
+        )
 
     @staticmethod
     def parse_color(color):
@@ -209,30 +368,45 @@ class Parser:
             color (str): The color value, which can be:
                 - 'none' or 'transparent': Returns `None`.
                 - 'rgba()': A string in the 'rgba(r,g,b,a)' format.
-                - '#RRGGBB', 'rgb()', or named colors: Validated by Pillow's ImageColor.
-                - Invalid colors: Replaced with a default color.
+                - '#RRGGBB', 'rgb()', or named colors: Parsed by Pillow's ImageColor.
+                - Invalid colors: Replaced with the default color.
 
         Returns:
-            tuple or str or None:
+            tuple or None:
                 - `None` if the color is 'none' or 'transparent'.
-                - `(r, g, b, a)` if the color is in 'rgba()' format.
-                - The original string for valid named or hex colors.
-                - Default color if invalid.
-        """
-        if not color or color in ["none", "transparent"]:
-            return None
-
-        if color.startswith('rgba'):
-            try:
-                values = color[color.index('(') + 1:color.index(')')].split(',')
-                r, g, b = map(int, values[:3])
-                a = int(float(values[3]) * 255) if len(values) == 4 else 255
-                return r, g, b, a
-            except (ValueError, IndexError):
-                return Parser.DEFAULT_COLOR
+                - `(r, g, b, a)` otherwise, with the default color's values if invalid.
+        """
+        return _parse_color(color)
+
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def _parse_color(color):
+    """
+    Cached implementation of Parser.parse_color.
+
+    SVG files tend to reuse a handful of colors across thousands of elements, so each
+    distinct string is parsed once. Returning an RGBA tuple also spares Pillow from
+    parsing the string again at draw time.
+
+    Args:
+        color (str): The color value.
+
+    Returns:
+        tuple or None: The `(r, g, b, a)` color, or `None` if the color is transparent.
+    """
+    if not color or color in ["none", "transparent"]:
+        return None
 
+    if color.startswith('rgba'):
         try:
-            ImageColor.getrgb(color)
-            return color
-        except ValueError:
-            return Parser.DEFAULT_COLOR
+            values = color[color.index('(') + 1:color.index(')')].split(',')
+            r, g, b = map(int, values[:3])
+            a = int(float(values[3]) * 255) if len(values) == 4 else 255
+            return r, g, b, a
+        except (ValueError, IndexError):
+            return _parse_color(Parser.DEFAULT_COLOR)
+
+    try:
+        return ImageColor.getcolor(color, 'RGBA')
+    except ValueError:
+        return _parse_color(Parser.DEFAULT_COLOR)
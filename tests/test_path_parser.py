@@ -0,0 +1,112 @@
+import importlib.util
+import random
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from scripts import _path_kernels, path_parser
+from scripts.path_parser import PathParser
+
+HAVE_NUMBA = importlib.util.find_spec('numba') is not None
+
+
+def _parse(path_data, compiled, tolerance=PathParser.TOLERANCE):
+    """
+    Parses path data through the compiled command loop or through the command handlers.
+    """
+    with mock.patch.object(path_parser, 'NUMBA_MIN_LENGTH', 0 if compiled else float('inf')):
+        return PathParser(path_data, tolerance).parse()
+
+
+def _random_path(rng):
+    """
+    Builds path data from random commands, some of them short of numbers or with extra ones.
+    """
+    def number():
+        return '%g' % round(rng.uniform(-60, 60), rng.choice([0, 1, 3]))
+
+    parts = []
+    if rng.random() < 0.2:
+        parts.append(number())
+    for _ in range(rng.randint(1, 15)):
+        command = rng.choice('MLHVCSQTAZ')
+        arity = path_parser._COMMAND_ARITY[command]
+        numbers = []
+        for _ in range(1 if arity == 0 else rng.randint(1, 3)):
+            if command == 'A':
+                numbers += [number(), number(), number(), rng.choice('01'), rng.choice('01'), number(), number()]
+            else:
+                numbers += [number() for _ in range(arity)]
+        if rng.random() < 0.1:
+            numbers = numbers[:rng.randrange(len(numbers) + 1)]
+        elif rng.random() < 0.1:
+            numbers.append(number())
+        if rng.random() < 0.5:
+            command = command.lower()
+        parts.append(command + ' '.join(numbers))
+    return ' '.join(parts)
+
+
+class PathParserTest(unittest.TestCase):
+
+    def assertSubpathsEqual(self, subpaths, expected):
+        self.assertEqual([points.tolist() for points in subpaths], expected)
+
+    def implementations(self):
+        """
+        Returns the ways paths can be parsed here: by the handlers, and compiled if possible.
+        """
+        if HAVE_NUMBA and _path_kernels.compile_kernels():
+            return (False, True)
+        return (False,)
+
+    def test_command_missing_numbers_ends_path(self):
+        cases = {
+            'M 0 0 L 10 10 20': [[[0, 0], [10, 10]]],
+            'M 0 0 L 10 L 20 20': [],
+            'M 0 0 A 5 5 0 1 L 10 10': [],
+            'M 0 0 C 1 1 2 2 L 5 5': [],
+            'M 0 0 H 5 6 V': [[[0, 0], [5, 0], [6, 0]]],
+        }
+        for compiled in self.implementations():
+            for path_data, expected in cases.items():
+                with self.subTest(path_data=path_data, compiled=compiled):
+                    self.assertSubpathsEqual(_parse(path_data, compiled), expected)
+
+    def test_numbers_after_close_are_ignored(self):
+        for compiled in self.implementations():
+            with self.subTest(compiled=compiled):
+                self.assertSubpathsEqual(_parse('M 1 2 3 4 Z 5 6 L 7 8', compiled),
+                                         [[[1, 2], [3, 4], [1, 2]], [[1, 2], [7, 8]]])
+
+    def test_straight_curve_turning_back_keeps_its_tip(self):
+        cases = {
+            # Reaches x = 40/3 before coming back to x = 10.
+            'M 0 0 Q 20 0 10 0': 40 / 3,
+            'M 0 0 Q 20 0.001 10 0': 40 / 3,
+            # Starts and ends at the origin, turning back halfway to the control point.
+            'M 0 0 Q 8 0 0 0': 4,
+        }
+        for path_data, tip in cases.items():
+            with self.subTest(path_data=path_data):
+                points, = _parse(path_data, False)
+                self.assertAlmostEqual(points[:, 0].max(), tip, delta=PathParser.TOLERANCE)
+
+    @unittest.skipUnless(HAVE_NUMBA, 'Numba is not installed')
+    def test_compiled_loop_matches_handlers(self):
+        self.assertTrue(_path_kernels.compile_kernels())
+        rng = random.Random(0)
+        for _ in range(2000):
+            path_data = _random_path(rng)
+            tolerance = rng.choice([0.05, 0.25, 1.0])
+            expected = _parse(path_data, False, tolerance)
+            subpaths = _parse(path_data, True, tolerance)
+            with self.subTest(path_data=path_data, tolerance=tolerance):
+                self.assertEqual([points.shape for points in subpaths], [points.shape for points in expected])
+                for points, expected_points in zip(subpaths, expected):
+                    np.testing.assert_allclose(points, expected_points, atol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
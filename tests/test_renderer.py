@@ -0,0 +1,76 @@
+import unittest
+from unittest import mock
+
+from scripts import _aggdraw_backend, renderer
+from scripts.renderer import Renderer
+from scripts.svg_parser import LineElement, PathElement, PolylineElement
+
+RED = (255, 0, 0, 255)
+BLUE = (0, 0, 255, 255)
+TRANSPARENT = (255, 255, 255, 0)
+
+# A square with a square inside it, winding the other way.
+SQUARE_WITH_HOLE = 'M 10 10 L 90 10 L 90 90 L 10 90 Z M 30 30 L 30 70 L 70 70 L 70 30 Z'
+# The same, with the inner square winding the same way as the outer one.
+SQUARE_IN_SQUARE = 'M 10 10 L 90 10 L 90 90 L 10 90 Z M 30 30 L 70 30 L 70 70 L 30 70 Z'
+
+BACKENDS = ('pillow', 'aggdraw') if _aggdraw_backend.HAVE_AGGDRAW else ('pillow',)
+
+
+def _render(elements, backend):
+    renderer = Renderer(100, 100, backend=backend)
+    renderer.draw_elements(elements)
+    return renderer.image
+
+
+class RendererTest(unittest.TestCase):
+
+    def test_inner_subpath_winding_the_other_way_is_a_hole(self):
+        for backend in BACKENDS:
+            for stroke, width in ((None, 0), (BLUE, 1), (BLUE, 3)):
+                with self.subTest(backend=backend, width=width):
+                    image = _render([PathElement(SQUARE_WITH_HOLE, RED, stroke, width)], backend)
+                    self.assertEqual(image.getpixel((50, 50)), TRANSPARENT)
+                    self.assertEqual(image.getpixel((20, 50)), RED)
+
+    def test_inner_subpath_winding_the_same_way_is_filled(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                image = _render([PathElement(SQUARE_IN_SQUARE, RED, None, 0)], backend)
+                self.assertEqual(image.getpixel((50, 50)), RED)
+
+    def test_unfilled_shapes_without_stroke_draw_nothing(self):
+        elements = [LineElement(10, 10, 90, 90, None, 2),
+                    PolylineElement('10,90 90,10', None, None, 2),
+                    PathElement('M 10 50 L 90 50', None, None, 2)]
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                self.assertIsNone(_render(elements, backend).getbbox())
+                for element in elements:
+                    self.assertIsNone(_render([element], backend).getbbox())
+
+    def test_points_are_read_the_same_with_and_without_numpy(self):
+        cases = {
+            '1,2 3,4 5-6': [1, 2, 3, 4, 5, -6],
+            '10-20-30,40': [10, -20, -30, 40],
+            '1.5.5 2e1,-.5': [1.5, 0.5, 20, -0.5],
+            '1,2 3,4 5': [1, 2, 3, 4],
+            '1,2 x 3,4;': [1, 2, 3, 4],
+            '': [],
+        }
+        for numpy_min_length in (float('inf'), 0):
+            with mock.patch.object(renderer, 'NUMPY_POINTS_MIN_LENGTH', numpy_min_length):
+                for data, expected in cases.items():
+                    with self.subTest(data=data, numpy_min_length=numpy_min_length):
+                        self.assertEqual(Renderer(10, 10, scale=2)._parse_points(data), [2 * v for v in expected])
+
+    @unittest.skipUnless(_aggdraw_backend.HAVE_AGGDRAW, 'aggdraw is not installed')
+    def test_aggdraw_strokes_closed_subpath_without_area(self):
+        for backend in ('pillow', 'aggdraw'):
+            with self.subTest(backend=backend):
+                image = _render([PathElement('M 1 1 L 15 15 Z', RED, BLUE, 1)], backend)
+                self.assertIsNotNone(image.getbbox())
+
+
+if __name__ == '__main__':
+    unittest.main()